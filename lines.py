@@ -22,7 +22,7 @@ Run this module standalone to provide self-testing.
 
 
 __all__ = [
-    'vectorAB', 'distance', 'inclination', 'intersection',
+    'vectorAB', 'distance', 'distance2', 'inclination', 'intersection',
     'point_to_line_distance'
 ]
 
@@ -41,25 +41,39 @@ def vectorAB(A, B):
     Result:
         vector AB, where: A + AB = B
     """
-    return tuple([B[coord] - A[coord] for coord in (0, 1)])
+    return (B[0] - A[0], B[1] - A[1])
 
 
-def distance(A, B):
+# NB! Some routines below take math functions as default
+# arguments (_sqrt, _atan2): default arguments are local variables,
+# and local variables are looked up faster than globals.
+# Don't pass these arguments.
+
+
+def distance(A, B, _sqrt=sqrt):
     """Evaluate euqlidian distance between two points"""
-    result = 0.0
-    AB = vectorAB(A, B)
-    for coord in (0, 1):
-        result += AB[coord] ** 2
-    return sqrt(result)
+    dx = B[0] - A[0]
+    dy = B[1] - A[1]
+    return _sqrt(dx * dx + dy * dy)
 
 
-def inclination(A, B):
+def distance2(A, B):
+    """Evaluate squared euqlidian distance between two points.
+    
+    Use it instead of distance() to compare distances:
+    it needs no square root evaluation.
+    """
+    dx = B[0] - A[0]
+    dy = B[1] - A[1]
+    return dx * dx + dy * dy
+
+
+def inclination(A, B, _atan2=atan2):
     """Evaluate inclination of the line given by two points.
     
     Result is in radians.
     """
-    AB = vectorAB(A, B)
-    return atan2(*[AB[coord] for coord in (1, 0)])
+    return _atan2(B[1] - A[1], B[0] - A[0])
 
 
 def intersection(baseA, directionA, baseB, directionB):
@@ -69,31 +83,30 @@ def intersection(baseA, directionA, baseB, directionB):
         baseA, directionA - 1-st line base vector and direction vector;
         baseB, directionB - 2-nd line base vector and direction vector.
     """
+    (xA, yA) = baseA
+    (dxA, dyA) = directionA
+    (dxB, dyB) = directionB
     p = (
-            float(
-                (baseB[0] - baseA[0]) * directionB[1]
-                -
-                (baseB[1] - baseA[1]) * directionB[0]
-            )
+            float((baseB[0] - xA) * dyB - (baseB[1] - yA) * dxB)
             /
-            (directionA[0] * directionB[1] - directionA[1] * directionB[0])
+            (dxA * dyB - dyA * dxB)
     )
-    return tuple([baseA[coord] + p * directionA[coord] for coord in (0, 1)])
+    return (xA + p * dxA, yA + p * dyA)
 
 
-def point_to_line_distance(A, base, direction):
+def point_to_line_distance(A, base, direction, _sqrt=sqrt):
     """Evaluate the distance between point and line.
     
     Arguments:
         A - point;
         base, direction - line base and direction vectors.
     """
-    # Find the intersection point of the given line
-    # and the orthogonal line including the point A.
-    I = intersection(base, direction, A, (-direction[1], direction[0]))
-    # Return the distance between the point A
-    # and the intersection point I.
-    return distance(A, I)
+    # The distance is the cross product of the vector A -> base
+    # and the direction vector, divided by the direction vector length.
+    # There is no need to find the foot of the perpendicular.
+    return abs(
+        (base[0] - A[0]) * direction[1] - (base[1] - A[1]) * direction[0]
+    ) / _sqrt(direction[0] * direction[0] + direction[1] * direction[1])
 
 
 #----------------------------------------------------------------------
@@ -112,33 +125,33 @@ if __name__ == '__main__':
         
         def test_0(self):
             """Horizontal line case"""
-            self.failUnlessAlmostEqual(inclination((1, 2), (3, 2)), 0.0)
+            self.assertAlmostEqual(inclination((1, 2), (3, 2)), 0.0)
         
         def test_pi(self):
             """Horizontal line case, inclination is PI"""
-            self.failUnlessAlmostEqual(inclination((3, 2), (1, 2)), PI)
+            self.assertAlmostEqual(inclination((3, 2), (1, 2)), PI)
         
         def test_pi_d_2(self):
             """Vertical line case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 inclination((1, 2), (1, 10)), PI / 2
             )
         
         def test_pi_d_4(self):
             """Inclination is PI / 4"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 inclination((1, 10), (3, 12)), PI / 4
             )
         
         def test_pi_d_4_2(self):
             """Inclination is PI / 4, case 2"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 inclination((-5, 10), (-3, 12)), PI / 4
             )
         
         def testSamePoint(self):
             """Line is given by two equal points"""
-            self.failUnlessAlmostEqual(inclination((3, 2), (3, 2)), 0.0)
+            self.assertAlmostEqual(inclination((3, 2), (3, 2)), 0.0)
     
     
     class TestDistance(TestCase):
@@ -146,11 +159,23 @@ if __name__ == '__main__':
         
         def testSamePoint(self):
             """Same point distance"""
-            self.failUnlessAlmostEqual(distance((1, 2), (1, 2)), 0.0)
+            self.assertAlmostEqual(distance((1, 2), (1, 2)), 0.0)
         
         def testDifferentPoints(self):
             """Different points distance"""
-            self.failUnlessAlmostEqual(distance((2, -1), (5, 3)), 5.0)
+            self.assertAlmostEqual(distance((2, -1), (5, 3)), 5.0)
+    
+    
+    class TestDistance2(TestCase):
+        """distance2 routine tests"""
+        
+        def testSamePoint(self):
+            """Same point squared distance"""
+            self.assertEqual(distance2((1, 2), (1, 2)), 0)
+        
+        def testDifferentPoints(self):
+            """Different points squared distance"""
+            self.assertAlmostEqual(distance2((2, -1), (5.5, 3)), 28.25)
     
     
     class TestIntersection(TestCase):
@@ -160,7 +185,7 @@ if __name__ == '__main__':
         
         def testSame(self):
             """The same line case"""
-            self.failUnlessRaises(
+            self.assertRaises(
                 ZeroDivisionError,
                 intersection,
                 self.TEST_LINE[0],
@@ -170,7 +195,7 @@ if __name__ == '__main__':
         
         def testParallel(self):
             """Parallel lines case"""
-            self.failUnlessRaises(
+            self.assertRaises(
                 ZeroDivisionError,
                 intersection,
                 (5.0, 5.0), (3.0, 4.5),
@@ -179,7 +204,7 @@ if __name__ == '__main__':
         
         def testOrthogonal(self):
             """Orthogonal lines case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 distance(
                     intersection(
                         (7.0, 0.0), (1.5, -1.0),
@@ -192,7 +217,7 @@ if __name__ == '__main__':
         
         def testArbitrary(self):
             """Arbitrary lines case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 distance(
                     intersection(
                         (7.0, -2.5), (4.0, -3.0),
@@ -205,7 +230,7 @@ if __name__ == '__main__':
         
         def testInt(self):
             """Integer data case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 distance(
                     intersection(
                         (7, 6), (4, 3),
@@ -218,7 +243,7 @@ if __name__ == '__main__':
         
         def testVertical(self):
             """Vertical line case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 distance(
                     intersection(
                         (3.0, 1.5), (0.0, 1.0),
@@ -231,7 +256,7 @@ if __name__ == '__main__':
         
         def testHorizontal(self):
             """Horizontal line case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 distance(
                     intersection(
                         (3.0, 3.5), (1.0, 0.0),
@@ -248,35 +273,35 @@ if __name__ == '__main__':
         
         def testLineIncludesPoint(self):
             """Point is laying on the line"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance((1, 2), (0, 4), (1, -2)),
                 0.0
             )
         
         def testSameAsBase(self):
             """Point is the same as line base vector end point"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance((1, 2), (1, 2), (1, -2)),
                 0.0
             )
         
         def testVerticalLine(self):
             """Vertical line case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance((6, 8), (-1, 2), (0, 3)),
                 7.0
             )
         
         def testHorizontalLine(self):
             """Horizontal line case"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance((6, 8), (4, 5), (2, 0)),
                 3.0
             )
         
         def testFinitDistance(self):
             """Arbitrary line inclination, finit nonzero distance"""
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance((6, 8), (-1, -1), (3, 2)),
                 sqrt(13.0)
             )
@@ -21,6 +21,11 @@ where option (may be omitted) is one of the following:
     -d - draw shapes in a draft mode;
     -p - print shapes location after game over before exit.
 
+The game runs both under Python 2 and Python 3. PyPy is
+the fastest way to run it, if pygame is available for it:
+
+    pypy3 pytang.py option
+
 TODO:
     1. Shapes s.b. dockable, i.e. have a 'sticky edges';
     2. Library of standard images and means to display
@@ -33,22 +38,25 @@ TODO:
 """
 
 
-__all__ = []
+from __future__ import print_function
 
-import sys
+__all__ = []
 
 import math
 from math import pi as PI
 
-import getopt
+import sys
+import argparse
 
 import pygame
 from pygame import display, event, mouse, image, draw
 from pygame import QUIT, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
+from pygame import VIDEOEXPOSE
+from pygame.math import Vector2
 pygame.init()
 
 import lines
-from lines import distance, inclination, vectorAB
+from lines import distance2
 
 import shapes
 from shapes import Triangle, Parallelogram
@@ -69,6 +77,12 @@ BACKGROUND_COLOR = (0xFF, 0xFF, 0xFF)
 # Shape edge color
 SHAPE_COLOR = (0x00, 0x00, 0x00)
 
+# Min. shape rotation angle (in radians) worth redrawing the shape
+MIN_ROTATION_ANGLE = 1e-4
+
+# Max. game display refresh rate, frames per second
+FRAME_RATE = 60
+
 
 def _draw_shape_filled(surface, shape):
     """Draw the shape on the given surface.
@@ -80,7 +94,7 @@ def _draw_shape_filled(surface, shape):
     Result:
         bounding box, defined during the drawing;
     """
-    return draw.polygon(surface, SHAPE_COLOR, shape.get_vertices())
+    return draw.polygon(surface, SHAPE_COLOR, shape.get_vertices_int())
 
 def _draw_shape_draft(surface, shape):
     """Draw the shape on the given surface.
@@ -106,26 +120,18 @@ def _draw_shape_draft(surface, shape):
     draw.circle(
         surface, SHAPE_COLOR,
         # NB! draw.circle() expects integer arguments
-        map(int, ref_point), int(r_inner),
+        (int(ref_point[0]), int(ref_point[1])), int(r_inner),
         1 # circle edge width
     )
     
-    # Draw the cross in the inner circle center
-    for (a, b) in (
-        ((-1, 0), (+1, 0)),
-        ((0, +1), (0, -1))
-        
-    ):
-        draw.aaline(
-            surface, SHAPE_COLOR,
-            *[
-                [
-                    ref_point[coord] + r_inner / 3 * p[coord]
-                    for coord in (0, 1)
-                ]
-                for p in (a, b)
-            ]
-        )
+    # Draw the cross in the inner circle center.
+    # NB! The cross can't be drawn as one polyline without going
+    # over some arm twice, which makes that arm antialiased pixels
+    # darker, so two separate strokes are drawn.
+    (x, y) = ref_point
+    arm = r_inner / 3
+    draw.aaline(surface, SHAPE_COLOR, (x - arm, y), (x + arm, y))
+    draw.aaline(surface, SHAPE_COLOR, (x, y + arm), (x, y - arm))
     
     return shape_bounds
 
@@ -153,8 +159,16 @@ def main():
     screen = display.set_mode((SCREEN_W, SCREEN_H))
     screen.fill(BACKGROUND_COLOR)
     
-    # Create a game field copy for internal purposes
-    background = screen.copy()
+    # Create a game field copy for internal purposes.
+    # Filled shapes are drawn without antialiasing, so in this mode
+    # the field holds two colors only and an 8-bit palette surface
+    # is enough: erase blits move 4 times less data than from a
+    # screen copy. Draft mode antialiased lines need the screen format.
+    if DRAFT_MODE:
+        background = screen.copy()
+    else:
+        background = pygame.Surface((SCREEN_W, SCREEN_H), 0, 8)
+        background.set_palette([BACKGROUND_COLOR, SHAPE_COLOR])
     
     # Game objects - different shapes
     shapes = [
@@ -177,7 +191,7 @@ def main():
     # 3 columns, ergo, 3 x 3 = 9 cells.
     
     # One cell size
-    CELL_SIZE = (SCREEN_W / 3, SCREEN_H / 3)
+    CELL_SIZE = (SCREEN_W // 3, SCREEN_H // 3)
     
     # Shapes initial locations as (column, row) tuples.
     locations = (
@@ -186,42 +200,99 @@ def main():
         (2, 0)
     )
     
+    # NB! Filled shapes are drawn by integer vertices, so the shape
+    # redraw may be skipped, if integer vertices are not changed.
+    # Draft mode anti-aliased lines are drawn by float vertices.
     if DRAFT_MODE:
         draw_shape = _draw_shape_draft
+        int_drawing = False
     else:
         draw_shape = _draw_shape_filled
+        int_drawing = True
+    
+    # Move shapes to the initial locations, i.e. to the cell centers
+    (cell_w, cell_h) = CELL_SIZE
+    for (shape, (column, row)) in zip(shapes, locations):
+        shape.move_to(((column + 0.5) * cell_w, (row + 0.5) * cell_h))
+        frames[shape] = draw_shape(screen, shape)
+    
+    # Bigger shapes are touched more often, so the shapes are
+    # checked in the outer radius descending order on the mouse
+    # button push down. All the shapes have the same color, so
+    # the order in which they are drawn doesn't matter.
+    shapes.sort(key=lambda shape: shape.get_r_outer(), reverse=True)
     
-    # Move shapes to the initial locations
-    for i in range(len(shapes)):
-        shapes[i].move_to(
-            [
-                (locations[i][coord] + 0.5) * CELL_SIZE[coord]
-                for coord in (0, 1)
-            ]
-        )
-        frames[shapes[i]] = draw_shape(screen, shapes[i])
+    # Show the whole game field once. Later on, only the screen
+    # areas changed by the shape moving or rotation are updated.
+    display.flip()
     
     #---- Event loop
     
     do_exit = False
     
+    # Event loop clock, which keeps the loop from spinning the CPU,
+    # when some shape is moving or rotating
+    clock = pygame.time.Clock()
+    
     # Shape object which is moving or rotating now
     active_shape = None
+    # Active shape bounding rectangle, frames[active_shape]
+    # is updated, when the shape is released
+    active_frame = None
+    # Active shape rotation axle, is valid when the shape is rotating.
+    # NB! Shape reference point is not altered by rotation.
+    pivot = None
     # Mouse previous position, is valid when some shape
-    # is rotating or moving
+    # is rotating or moving.
+    # NB! Mouse positions are kept as pygame vectors: vector
+    # arithmetic is implemented in C.
     prev_pos = None
     
     while not do_exit:
         
-        display.flip()
+        if state == ST_NONE:
+            # No shape is moving or rotating, so the screen can't
+            # change until the user acts: sleep until some event
+            # arrives instead of polling the event queue.
+            # NB! There is no periodic screen update in this state,
+            # the idle window is repainted by the VIDEOEXPOSE handler
+            # (the expose event wakes the wait up).
+            events = [event.wait()]
+            events.extend(event.get())
+        else:
+            clock.tick(FRAME_RATE)
+            events = event.get()
         
-        for ev in event.get():
+        # Fast mouse moving queues a lot of motion events
+        # between two event loop passes. Motion handler uses the actual
+        # mouse position, so only the last event of each motion events
+        # run is handled, the previous ones are skipped.
+        # NB! Runs are coalesced separately, so the motion queued
+        # before a mouse button up is still handled before it.
+        last_index = len(events) - 1
+        for (index, ev) in enumerate(events):
+            
+            if (
+                (ev.type == MOUSEMOTION)
+                and
+                (index < last_index)
+                and
+                (events[index + 1].type == MOUSEMOTION)
+            ):
+                continue
             
             # Game is over - user close main window
             if ev.type == QUIT :
                 do_exit = True
                 break
             
+            # Window is uncovered or restored: only the changed areas
+            # are updated while shapes are moving, so the whole game
+            # field s.b. repainted here.
+            
+            elif ev.type == VIDEOEXPOSE:
+                display.flip()
+            
             # Mouse button is push down:
             # user wants to move or rotate one of the shapes
             
@@ -234,39 +305,66 @@ def main():
                 
                 for shape in shapes:
                     
+                    # The touchpoint outside the shape outer circle
+                    # is outside the shape too. This test is cheaper
+                    # than the shape.include() call, so it goes first.
+                    # NB! Distances are compared squared, so there is
+                    # no need to evaluate square roots.
+                    touch_distance2 = distance2(
+                        touchpoint, shape.get_ref_point()
+                    )
+                    r_outer = shape.get_r_outer()
+                    if touch_distance2 > r_outer * r_outer:
+                        continue
+                    
                     if shape.include(touchpoint):
                         
                         active_shape = shape
-                        prev_pos = touchpoint
+                        prev_pos = Vector2(touchpoint)
                         
                         # If the touchpoint is laying inside the
                         # inner circle, the shape s.b. moved;
                         # the shape s.b. rotated otherwise
-                        if (
-                            distance(touchpoint, shape.get_ref_point())
-                            <=
-                            shape.get_r_inner()
-                        ):
+                        r_inner = shape.get_r_inner()
+                        if touch_distance2 <= r_inner * r_inner:
                             state = ST_MOVE
                         else:
                             state = ST_ROTATE
+                            pivot = Vector2(shape.get_ref_point())
                         
                         
-                        # Take the active shape from the shapes
-                        # common list,
-                        # draw other shapes on the background surface.
+                        # Draw other shapes on the background surface.
+                        # The active shape stays in the shapes common
+                        # list, so the list order is kept stable.
                         
-                        shapes.remove(active_shape)
-                        background.fill(BACKGROUND_COLOR)
-                        for shape in shapes:
-                            draw_shape(background, shape)
+                        # The screen already shows all the shapes,
+                        # so the background is the screen copy with
+                        # the active shape frame erased. Only shapes
+                        # overlapping this frame s.b. redrawn.
+                        # NB! The redraw is clipped by the erased frame:
+                        # antialiased lines blend with the pixels under
+                        # them, so redrawing a shape over its own
+                        # pixels outside the frame would darken them.
+                        
+                        active_frame = frames[active_shape]
+                        background.blit(screen, (0, 0))
+                        background.fill(BACKGROUND_COLOR, active_frame)
+                        background.set_clip(active_frame)
+                        for other in shapes:
+                            if (
+                                (other is not active_shape)
+                                and
+                                frames[other].colliderect(active_frame)
+                            ):
+                                draw_shape(background, other)
+                        background.set_clip(None)
                         
                         break
             
             # Mouse button is up: shape moving/rotating is done
             
             elif (ev.type == MOUSEBUTTONUP) and (state != ST_NONE) :
-                shapes.append(active_shape)
+                frames[active_shape] = active_frame
                 active_shape = None
                 state = ST_NONE
             
@@ -276,35 +374,61 @@ def main():
             
             elif (ev.type == MOUSEMOTION) and (state != ST_NONE) :
                 
-                screen.blit(
-                    background,
-                    frames[active_shape].topleft, frames[active_shape]
-                )
+                curr_pos = Vector2(mouse.get_pos())
+                
+                # Mouse is not moved really - nothing to redraw
+                if curr_pos == prev_pos:
+                    continue
                 
-                curr_pos = mouse.get_pos()
+                if state == ST_ROTATE :
+                    # NB! Vector2.angle_to() result is in degrees
+                    angle = math.radians(
+                        (prev_pos - pivot).angle_to(curr_pos - pivot)
+                    )
+                    # Rotation angle is too small to be visible.
+                    # NB! prev_pos is kept, so small angles are
+                    # accumulated until the rotation is noticeable.
+                    if abs(angle) < MIN_ROTATION_ANGLE:
+                        continue
+                
+                if int_drawing:
+                    vertices_int = active_shape.get_vertices_int()
                 
                 if state == ST_MOVE :
-                    active_shape.move_by(vectorAB(prev_pos, curr_pos))
+                    active_shape.move_by(curr_pos - prev_pos)
                 else:
-                    active_shape.rotate(
-                        inclination(
-                            active_shape.get_ref_point(), curr_pos
-                        )
-                        -
-                        inclination(
-                            active_shape.get_ref_point(), prev_pos
-                        )
-                    )
+                    active_shape.rotate(angle)
                 
                 prev_pos = curr_pos
-                frames[active_shape] = draw_shape(screen, active_shape)
+                
+                # Filled shape is drawn by integer vertices. If these
+                # are the same, the shape on the screen is the same too.
+                if (
+                    int_drawing
+                    and
+                    (active_shape.get_vertices_int() == vertices_int)
+                ):
+                    continue
+                
+                screen.blit(background, active_frame.topleft, active_frame)
+                new_frame = draw_shape(screen, active_shape)
+                
+                # Only the erased and the newly drawn areas
+                # are changed on the screen. These areas are
+                # overlapping usually, and one union area is updated
+                # faster than two areas with a common part.
+                if active_frame.colliderect(new_frame):
+                    display.update(active_frame.union(new_frame))
+                else:
+                    display.update([active_frame, new_frame])
+                active_frame = new_frame
     
     # Game is over, print shapes location if needed
     if PRINT_OUT:
         for i in range(len(shapes)):
-            print "Shape %u vertices:" % (i,)
+            print("Shape %u vertices:" % (i,))
             for vertex in shapes[i].get_vertices():
-                print "\t (%.2f, %.2f)" % vertex
+                print("\t (%.2f, %.2f)" % vertex)
 
 
 #----------------------------------------------------------------------
@@ -314,17 +438,17 @@ def main():
 
 if __name__ == '__main__':
     
-    (opts, args) = getopt.getopt(sys.argv[1 : ], 'dhp')
-    for option, value in opts:
-        
-        if option == '-h':
-            print __doc__
-            exit()
-        
-        if option == '-d':
-            DRAFT_MODE = True
-        
-        if option == '-p':
-            PRINT_OUT = True
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-h', dest='help', action='store_true')
+    parser.add_argument('-d', dest='draft_mode', action='store_true')
+    parser.add_argument('-p', dest='print_out', action='store_true')
+    options = parser.parse_args()
+    
+    if options.help:
+        print(__doc__)
+        sys.exit()
+    
+    DRAFT_MODE = options.draft_mode
+    PRINT_OUT = options.print_out
     
     main()
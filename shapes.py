@@ -12,6 +12,8 @@ accessible via appropriate routines:
         rotation axle etc.;
     inner radius - radius of the inner circle with center in
         reference point;
+    outer radius - radius of the min circle with center in
+        reference point, which includes the whole shape;
 
 Point is defined as in lines.py module, i.e. as (X, Y) tuple.
 
@@ -34,51 +36,53 @@ def in_triangle(point, A, B, C):
     """Check if the given point is located inside the triangle.
     
     The triangle is given by 3 vertices: A, B, C.
-    NB! It is assumed, that vertices are not laying on the same line.
+    Points laying on the triangle edges are inside the triangle.
+    NB! Triangle with all vertices laying on the same line
+    includes no points.
     """
     
     # The line connecting each two vertices divides
-    # a plane on two halfs.
-    # If the point is located inside the triangle, the
-    # point and the third vertex are located in the same half-plane,
-    # and this is true for every pair of vertices.
-    
-    vertices = (A, B, C)
-    
-    for n in range(0, 3):
-        
-        vertex0 = vertices[n]
-        vertex1 = vertices[(n + 1) % 3]
-        vertex2 = vertices[(n + 2) % 3]
-        
-        side = [
-                (
-                    (vertex2[0] - vertex1[0]) * (p[1] - vertex1[1]) -
-                    (vertex2[1] - vertex1[1]) * (p[0] - vertex1[0])
-                )
-            for p in (point, vertex0)
-        ]
-        
-        # point and vertex0 are located in the same half-plane
-        # iff side[0] and side[1] have the same sign.
-        # If side[0] is 0, the point is laying on line between
-        # vertex1 and vertex2.
-        
-        assert side[1] != 0.0, \
-            "Points %s, %s, %s are laying on the same line" % \
-            (A, B, C)
-        
-        # HACK! We check, if side[0] and side[1]
-        # have a same sign or side[0] is 0 in such a manner:
-        if side[0] * side[1] < 0:
-            return False
+    # a plane on two halfs. The cross product of the edge vector
+    # and the vector from the edge start to the point has
+    # the sign of the half-plane the point is located in,
+    # or is 0, if the point is laying on the edge line.
+    # The point is located inside the triangle iff there are
+    # no cross products with the opposite signs.
+    
+    (x, y) = point
+    d1 = (A[0] - C[0]) * (y - C[1]) - (A[1] - C[1]) * (x - C[0])
+    d2 = (B[0] - A[0]) * (y - A[1]) - (B[1] - A[1]) * (x - A[0])
+    d3 = (C[0] - B[0]) * (y - B[1]) - (C[1] - B[1]) * (x - B[0])
+    
+    has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
+    has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
+    
+    # All cross products are 0 only if the triangle vertices
+    # are laying on the same line
+    return (has_neg or has_pos) and not (has_neg and has_pos)
+
+
+def _cross_sign(A, B, point):
+    """Find the side of the AB line, where the point is located.
     
-    return True
+    Result is -1 or +1, when the point is located in the one or
+    the other half-plane, or 0, if the point is laying on the line.
+    """
+    cross = (
+        (B[0] - A[0]) * (point[1] - A[1]) - (B[1] - A[1]) * (point[0] - A[0])
+    )
+    return (cross > 0) - (cross < 0)
 
 
-class Shape:
+class Shape(object):
     """Generic shape class"""
     
+    # Shape instances have no __dict__: attribute access is faster,
+    # and the instances are smaller.
+    __slots__ = (
+        '_vertices', '_ref_point', '_r_inner', '_r_outer', '_vertices_int'
+    )
+    
     def __init__(self, vertices, ref_point, r_inner):
         """Constructor.
         
@@ -87,41 +91,68 @@ class Shape:
             ref_point - shape reference point;
             r_inner - shape inner radius.
         """
-        self.__vertices = tuple(vertices)
-        self.__ref_point = ref_point
-        self.__r_inner = r_inner
+        self._vertices = tuple(vertices)
+        self._ref_point = ref_point
+        self._r_inner = r_inner
+        # Shape moving and rotation don't alter the outer radius,
+        # so it is evaluated once
+        self._r_outer = max(
+            [distance(ref_point, vertex) for vertex in self._vertices]
+        )
+        # Integer vertices cache, see get_vertices_int()
+        self._vertices_int = None
     
     def get_vertices(self):
         """Shape vertices getter"""
-        return self.__vertices
+        return self._vertices
+    
+    def get_vertices_int(self):
+        """Shape vertices getter, vertex coords are truncated to integers.
+        
+        Result is cached until the shape is moved or rotated.
+        """
+        if self._vertices_int is None:
+            self._vertices_int = tuple(
+                [(int(x), int(y)) for (x, y) in self._vertices]
+            )
+        return self._vertices_int
     
     def get_ref_point(self):
         """Shape reference point getter"""
-        return self.__ref_point
+        return self._ref_point
     
     def get_r_inner(self):
         """Shape inner radius getter"""
-        return self.__r_inner
+        return self._r_inner
+    
+    def get_r_outer(self):
+        """Shape outer radius getter.
+        
+        Outer radius is the max distance between the reference point
+        and the shape vertices.
+        """
+        return self._r_outer
     
     def rotate(self, angle):
         """Rotate a shape by an angle specified in radians.
         
         Shape reference point is used as a rotation axle.
+        So the reference point and the inner radius are not
+        altered by rotation and need no re-evaluation.
         """
-        self.__vertices = tuple(
-            self.__moved_by(
-                [
-                    (
-                        point[0] * cos(angle) - point[1] * sin(angle),
-                        point[0] * sin(angle) + point[1] * cos(angle)
-                    )
-                    for point in
-                        self.__moved_by(self.__vertices, self.__ref_point, -1)
-                ],
-                self.__ref_point,
-                +1
-            )
+        cos_a = cos(angle)
+        sin_a = sin(angle)
+        (rx, ry) = self._ref_point
+        self._vertices = tuple(
+            [
+                (
+                    (x - rx) * cos_a - (y - ry) * sin_a + rx,
+                    (x - rx) * sin_a + (y - ry) * cos_a + ry
+                )
+                for (x, y) in self._vertices
+            ]
         )
+        self._vertices_int = None
     
     def move_to(self, point):
         """Move shape to the given location.
@@ -129,53 +160,33 @@ class Shape:
         Shape is moved to bring the reference point
         to the given location.
         """
-        self.__vertices = tuple(
-            self.__moved_by(
-                self.__vertices,
-                self.__moved_by((self.__ref_point,), point, -1)[0],
-                -1
-            )
+        self._shift(
+            point[0] - self._ref_point[0], point[1] - self._ref_point[1]
         )
-        self.__ref_point = point
+        self._ref_point = point
     
     def move_by(self, offset):
         """Move shape relatively"""
-        self.__ref_point, = \
-            self.__moved_by((self.__ref_point, ), offset, 1)
-        self.__vertices = \
-            tuple(self.__moved_by(self.__vertices, offset, 1))
+        (dx, dy) = offset
+        self._shift(dx, dy)
+        self._ref_point = (self._ref_point[0] + dx, self._ref_point[1] + dy)
     
-    @staticmethod
-    def __moved_by(points, offset, sign):
-        """Move points sequence by the given bias.
+    def _shift(self, dx, dy):
+        """Move shape vertices by (dx, dy).
         
-        Arguments:
-            points - points sequence;
-            offset - movement amount as a tuple (delta x, delta y);
-            sign - movement sign (whether the offset s.b. added or
-                substracted from the point coord) - negative or
-                positive value;
-        
-        Result:
-            input sequence copy, moved by the given offset.
+        NB! Shape reference point is not moved.
         """
-        
-        sign = (sign >= 0) - (sign < 0)
-        
-        return [
-            tuple(
-                [
-                    point[coord] + sign * offset[coord]
-                    for coord in (0, 1)
-                ]
-            )
-            for point in points
-        ]
+        self._vertices = tuple(
+            [(x + dx, y + dy) for (x, y) in self._vertices]
+        )
+        self._vertices_int = None
 
 
 class Triangle(Shape):
     """Triangle shape class"""
     
+    __slots__ = ()
+    
     def __init__(self, A, B, C):
         """Constructor.
         
@@ -183,31 +194,24 @@ class Triangle(Shape):
         """
         
         # Triangle inner circle center evaluation.
-        # Point is evaluated as an intersection of triangle
-        # bissectrisses.
-        
-        # Find triangle edges inclination
-        BAX = inclination(B, A)
-        CAX = inclination(C, A)
-        BCX = inclination(B, C)
-        
-        # Find bissectrisses inclination
-        IAX = (BAX + CAX) / 2
-        ICX = (BCX + (CAX + PI)) / 2
-        
-        # Find bissectrisses intersection
-        I = intersection(
-            A, (cos(IAX), sin(IAX)),
-            C, (cos(ICX), sin(ICX))
+        # Point is evaluated as an average of triangle vertices,
+        # weighted by the lengths of the opposite edges.
+        a = distance(B, C)
+        b = distance(A, C)
+        c = distance(A, B)
+        perimeter = a + b + c
+        I = (
+            (a * A[0] + b * B[0] + c * C[0]) / perimeter,
+            (a * A[1] + b * B[1] + c * C[1]) / perimeter
         )
         
         # Triangle inner circle radius evaluation. Radius is
-        # evaluated as a distance between point I and one of
-        # the triangle edges
-        r_inner = point_to_line_distance(
-            I,
-            A, (cos(CAX), sin(CAX))
-        )
+        # evaluated as a doubled triangle area divided by the
+        # triangle perimeter. Doubled area is the absolute value of
+        # the cross product of the two triangle edge vectors.
+        r_inner = abs(
+            (B[0] - A[0]) * (C[1] - A[1]) - (B[1] - A[1]) * (C[0] - A[0])
+        ) / perimeter
         
         # Call the base class constructor
         Shape.__init__(
@@ -222,6 +226,8 @@ class Triangle(Shape):
 class Parallelogram(Shape):
     """Parallelogram shape class"""
     
+    __slots__ = ('_b_side', )
+    
     def __init__(self, A, B, C):
         """Constructor.
         
@@ -229,18 +235,26 @@ class Parallelogram(Shape):
         """
         
         # Find the 4-th vertex
-        D = tuple([A[coord] + C[coord] - B[coord] for coord in (0, 1)])
+        D = (A[0] + C[0] - B[0], A[1] + C[1] - B[1])
         
         # Find reference point as parallelogram diagonales
-        # intersection point
-        I = intersection(A, vectorAB(A, C), B, vectorAB(D, B))
+        # intersection point, i.e. as the AC diagonal middle point
+        I = ((A[0] + C[0]) / 2.0, (A[1] + C[1]) / 2.0)
         
         # Find inner circle radius as min distance between
-        # I point and parallelogram edges
-        r = min(
-            point_to_line_distance(I, A, vectorAB(A, B)),
-            point_to_line_distance(I, A, vectorAB(A, D))
+        # I point and parallelogram edges, i.e. as a half of
+        # the min parallelogram height. The height is evaluated as
+        # the parallelogram area divided by the edge length, and
+        # the area is the absolute value of the edges cross product.
+        area = abs(
+            (B[0] - A[0]) * (C[1] - B[1]) - (B[1] - A[1]) * (C[0] - B[0])
         )
+        r = area / max(distance(A, B), distance(B, C)) / 2
+        
+        # Find the side of the AC diagonal, where the B vertex
+        # is located, as the cross product sign. Shape moving and
+        # rotation don't alter it, so it is evaluated once.
+        self._b_side = _cross_sign(A, C, B)
         
         # Call the base class constructor
         Shape.__init__(self, (A, B, C, D), I, r)
@@ -248,8 +262,12 @@ class Parallelogram(Shape):
     def include(self, point):
         """Check if the point is located inside the parallelogram"""
         A, B, C, D = self.get_vertices()
-        return \
-            in_triangle(point, A, B, C) or in_triangle(point, C, D, A)
+        # The AC diagonal divides the parallelogram on two triangles.
+        # Only the triangle on the point side of the diagonal
+        # s.b. checked.
+        if _cross_sign(A, C, point) * self._b_side >= 0:
+            return in_triangle(point, A, B, C)
+        return in_triangle(point, C, D, A)
 
 
 #----------------------------------------------------------------------
@@ -320,10 +338,20 @@ if __name__ == '__main__':
             """Point of interest is laying on the triangle edge"""
             point = (5, 2.5)
             A, B, C = (3, 1), (6, 1), (7, 4)
-            self.failUnlessAlmostEqual(
+            self.assertAlmostEqual(
                 point_to_line_distance(point, A, vectorAB(A, C)), 0.0
             )
             assert in_triangle(point, A, B, C)
+        
+        def testReversedVertices(self):
+            """Triangle vertices are given in the opposite order"""
+            assert in_triangle((0, 0), *reversed(self.TEST_TRI_2))
+            assert not in_triangle((1, 1), *reversed(self.TEST_TRI_1))
+        
+        def testDegenerate(self):
+            """Triangle vertices are laying on the same line"""
+            assert not in_triangle((1, 1), (0, 0), (1, 1), (2, 2))
+            assert not in_triangle((1, 0), (0, 0), (1, 1), (2, 2))
     
     
     class TestShape(TestCase):
@@ -375,6 +403,15 @@ if __name__ == '__main__':
                 vertices=((0, 0), (0, 1), (2, 2), (3, 0))
             )
         
+        def testNoInstanceDict(self):
+            """Shape classes instances have no __dict__"""
+            for s in (
+                Shape([(0, 0), (1, 1), (-2, -2)], (0, 0), 2),
+                Triangle((0, 0), (1, 0), (0, 1)),
+                Parallelogram((0, 0), (1, 0), (2, 1))
+            ):
+                assert not hasattr(s, '__dict__')
+        
         #---- rotate() method tests
         
         def testRotate360(self):
@@ -432,6 +469,45 @@ if __name__ == '__main__':
                 [(1, 2), (1, 5), (3, 2)]
             )
             assert isinstance(s.get_vertices(), tuple)
+        
+        #---- get_r_outer() method tests
+        
+        def testROuter(self):
+            """Outer radius is the max vertex distance"""
+            s = Shape([(0, 0), (0, 3), (4, 0)], (0, 0), 1.0)
+            self.assertAlmostEqual(s.get_r_outer(), 4.0)
+        
+        def testROuterMoved(self):
+            """Outer radius is kept by shape moving and rotation"""
+            s = Shape([(0, 0), (0, 3), (4, 0)], (1, 1), 1.0)
+            r_outer = s.get_r_outer()
+            s.move_by((2, -7))
+            s.rotate(PI / 5)
+            s.move_to((10, 10))
+            ref_point = s.get_ref_point()
+            self.assertAlmostEqual(
+                max([distance(ref_point, v) for v in s.get_vertices()]),
+                r_outer
+            )
+        
+        #---- get_vertices_int() method tests
+        
+        def testVerticesInt(self):
+            """Integer vertices are truncated shape vertices"""
+            s = Shape([(0.5, 0.9), (0, 3.2), (-2.7, 0)], (0, 0), 1.0)
+            assert s.get_vertices_int() == ((0, 0), (0, 3), (-2, 0))
+            assert s.get_vertices_int() is s.get_vertices_int()
+        
+        def testVerticesIntMoved(self):
+            """Integer vertices follow the shape moving and rotation"""
+            s = Shape([(0, 0), (0, 3), (2, 0)], (4, 6), 1.0)
+            s.get_vertices_int()
+            s.move_by((1.5, 2))
+            assert s.get_vertices_int() == ((1, 2), (1, 5), (3, 2))
+            s.move_to((4, 6))
+            assert s.get_vertices_int() == ((0, 0), (0, 3), (2, 0))
+            s.rotate(PI / 2)
+            assert s.get_vertices_int() != ((0, 0), (0, 3), (2, 0))
     
     
     class TestTriangle(TestCase):
@@ -458,7 +534,7 @@ if __name__ == '__main__':
                         point[coord] + offset[coord]
                         for coord in (0, 1)
                     ]
-                for point in (-22, -7), (11, 23), (12, -12)
+                for point in ((-22, -7), (11, 23), (12, -12))
             ]
             
             triangle = Triangle(*vertices)
@@ -469,7 +545,7 @@ if __name__ == '__main__':
                 (1.2 + offset[0], 0.1 + offset[1]), 0.1
             )
             
-            self.failUnlessAlmostEqual(triangle.get_r_inner(), 10.4, 2)
+            self.assertAlmostEqual(triangle.get_r_inner(), 10.4, 2)
             
             return triangle
         
@@ -488,16 +564,18 @@ if __name__ == '__main__':
             )
             
             B.rotate(angle)
-            # Copy rotated work object, because some of Triangle
-            # parameters are evaluated in constructor, and
-            # ARE NOT ALTERED by rotation operation
-            C = Triangle(*B.get_vertices())
             
             assert not shapes_eq(
-                A.get_vertices(), C.get_vertices()
+                A.get_vertices(), B.get_vertices()
             )
-            assert points_eq(A.get_ref_point(), C.get_ref_point())
-            self.failUnlessAlmostEqual(A.get_r_inner(), C.get_r_inner())
+            assert points_eq(A.get_ref_point(), B.get_ref_point())
+            self.assertAlmostEqual(A.get_r_inner(), B.get_r_inner())
+            
+            # Rotated object parameters are the same as
+            # the parameters evaluated from scratch
+            C = Triangle(*B.get_vertices())
+            assert points_eq(B.get_ref_point(), C.get_ref_point())
+            self.assertAlmostEqual(B.get_r_inner(), C.get_r_inner())
         
         #---- Creation tests
         
@@ -544,7 +622,7 @@ if __name__ == '__main__':
                 (0, 4), (2 * sqrt(3), -2), (-2 * sqrt(3), -2)
             )
             assert points_eq(triangle.get_ref_point(), (0, 0))
-            self.failUnlessAlmostEqual(triangle.get_r_inner(), 2)
+            self.assertAlmostEqual(triangle.get_r_inner(), 2)
     
     
     class TestParallelogram(TestCase):
@@ -568,7 +646,19 @@ if __name__ == '__main__':
                 (5, 2.5)
             )
             
-            self.failUnlessEqual(parallelogram.get_r_inner(), 1.5)
+            self.assertEqual(parallelogram.get_r_inner(), 1.5)
+        
+        def testRotate(self):
+            """Rotated parallelogram keeps its parameters"""
+            parallelogram = Parallelogram(*self.VERTICES0)
+            parallelogram.rotate(PI / 3)
+            copy = Parallelogram(*parallelogram.get_vertices()[:3])
+            assert points_eq(
+                parallelogram.get_ref_point(), copy.get_ref_point()
+            )
+            self.assertAlmostEqual(
+                parallelogram.get_r_inner(), copy.get_r_inner()
+            )
         
         #---- include() method tests
         
@@ -581,6 +671,20 @@ if __name__ == '__main__':
         def testIncludeRefPoint(self):
             parallelogram = Parallelogram(*self.VERTICES0)
             assert parallelogram.include(parallelogram.get_ref_point())
+        
+        def testNotInclude(self):
+            """Points outside on the both sides of the AC diagonal"""
+            parallelogram = Parallelogram(*self.VERTICES0)
+            assert not parallelogram.include((9, 2))
+            assert not parallelogram.include((1, 3))
+        
+        def testIncludeRotated(self):
+            parallelogram = Parallelogram(*self.VERTICES0)
+            parallelogram.rotate(PI / 2)
+            assert parallelogram.include((4, 3))
+            assert parallelogram.include((6, 0))
+            assert not parallelogram.include((6, 5))
+            assert not parallelogram.include((4, 0))
     
     
     unittest.main()